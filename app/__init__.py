@@ -0,0 +1,55 @@
+# __init__.py - application factory for the Handicapping webapp
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+#
+# Blueprint modules only import Flask at module level. PyPDF2, markdown,
+# requests and numpy are imported inside the views that use them, so the app starts
+# without loading them and each one is paid for on the first request that
+# needs it. scripts/bench_startup.py measures the cold start.
+
+import os
+import logging
+from flask import Flask, render_template_string
+
+HOME_PAGE = """
+    <h1>Welcome to the Horse Racing Portal 🏇</h1>
+    <ul>
+        <li><a href="/horsesite">🐴 Horse Data Processor</a></li>
+        <li><a href="/horseinput">📝 Manual Horse Input</a></li>
+        <li><a href="/horsepools">🎱 Pool Data Processor</a></li>
+        <li><a href="/horsetickets">🎟️ Ticket Builder</a></li>
+        <li><a href="/pdfPP">📄 Upload & Split PDF</a></li>
+        <li><a href="/manage">🗑️ Manage Files</a></li>
+    </ul>
+    """
+
+
+def create_app():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    logging.info(f"OpenRouter API key {'set' if os.environ.get('OPENROUTER_API_KEY') else 'NOT set'}")
+
+    from app.horsesite import horsesite_bp
+    from app.horsepdf import split_bp
+    from app.management import manage_bp
+    from app.horseinput import horseinput_bp
+    from app.horsepools import horsepools_bp
+    from app.horsetickets import horsetickets_bp
+
+    # Templates and blueprints live at the project root / app package
+    app = Flask(__name__, root_path=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    app.secret_key = 'unified-horse-key'  # Shared across blueprints
+
+    # Register blueprints at desired paths
+    app.register_blueprint(horsesite_bp)
+    app.register_blueprint(split_bp)
+    app.register_blueprint(manage_bp)
+    app.register_blueprint(horseinput_bp)
+    app.register_blueprint(horsepools_bp)
+    app.register_blueprint(horsetickets_bp)
+
+    @app.route('/')
+    def home():
+        return render_template_string(HOME_PAGE)
+
+    return app
@@ -5,23 +5,21 @@
 
 import os
 import json
-import logging
-import requests
 from datetime import date
 from flask import Blueprint, request, render_template, jsonify
 from markupsafe import Markup
-import markdown
 
-horseinput_bp = Blueprint('horseinput_bp', __name__, url_prefix='/horseinput')
+from app.openrouter import chat_completion
+from app.modelrouter import AUTO_MODEL
+from app.racecontext import race_contexts, race_key
 
-logging.basicConfig(level=logging.INFO)
+horseinput_bp = Blueprint('horseinput_bp', __name__, url_prefix='/horseinput')
 
 BASE_DIR = os.environ.get('BASE_DIR', os.getcwd())
 PROMPT_FILE = os.path.join(BASE_DIR, os.environ.get('PROMPT_FILE2', 'data/prompt_template2.txt'))
 JSON_PATH = os.path.join(BASE_DIR, os.environ.get('JSON_PATH', 'data/models.json'))
 
 OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
-logging.info(f"API_KEY={OPENROUTER_API_KEY}")
 
 DEFAULT_PROMPT_TEMPLATE = """# {timestamp}
 
@@ -83,7 +81,7 @@ def load_models():
     try:
         with open(JSON_PATH, 'r') as f:
             models_data = json.load(f)
-        return [(m['display_name'], m['model_id']) for m in models_data]
+        return [AUTO_MODEL] + [(m['display_name'], m['model_id']) for m in models_data]
     except Exception:
         return [
             ("GPT-4o", "openai/gpt-4o"),
@@ -123,8 +121,15 @@ def index():
             error = "API Key not set."
         else:
             timestamp = build_timestamp(track, race_date, race_number)
+            # Race data goes in this user's per-race context; the prompt refers to it
+            # Only cache when date, track and race all identify the race
+            cacheable = race_date and track and race_number
+            context_messages, fields = race_contexts.prepare(
+                race_key(timestamp) if cacheable else None,
+                speed_data=speed_data, class_data=class_data, input_pace_data=pace_data
+            )
             prompt = load_prompt_from_file(
-                track, speed_data, class_data, pace_data,
+                track, fields['speed_data'], fields['class_data'], fields['input_pace_data'],
                 race_date, race_number, user_insights
             )
 
@@ -137,24 +142,18 @@ def index():
 
             data = {
                 'model': selected_model,
-                'messages': [{'role': 'user', 'content': prompt}],
+                'messages': context_messages + [{'role': 'user', 'content': prompt}],
                 'temperature': 0.7,
                 'max_tokens': 4000
             }
 
             try:
-                response = requests.post(
-                    'https://openrouter.ai/api/v1/chat/completions',
-                    headers=headers,
-                    json=data
-                )
-                response.raise_for_status()
-
-                raw = response.json()['choices'][0]['message']['content']
+                raw = chat_completion(headers, data)['choices'][0]['message']['content']
 
                 # PREPEND TIMESTAMP TO MARKDOWN SHOWN IN horseinput.html
                 final_markdown = f"# {timestamp}\n\n" + raw
 
+                import markdown
                 result_html = Markup(markdown.markdown(final_markdown))
 
             except Exception as e:
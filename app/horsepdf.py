@@ -8,13 +8,12 @@
 import os, re, json, logging
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from werkzeug.utils import secure_filename
-from PyPDF2 import PdfReader, PdfWriter
-import requests
+
+from app.openrouter import chat_completion
+from app.modelrouter import AUTO_MODEL
 
 split_bp = Blueprint('split_bp', __name__, url_prefix='/pdfPP')
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 # Load paths from environment
@@ -24,17 +23,14 @@ SPLIT_FOLDER = os.path.join(BASE_DIR, os.environ.get('SPLIT_FOLDER', 'split_race
 MODELS_FILE = os.path.join(BASE_DIR, os.environ.get('MODELS_FILE', 'data/models.json'))
 OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
 
-# Ensure folders exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-os.makedirs(SPLIT_FOLDER, exist_ok=True)
-
 ALLOWED_EXTENSIONS = {'pdf'}
 
 def get_available_models():
+    auto = {"display_name": AUTO_MODEL[0], "model_id": AUTO_MODEL[1]}
     if os.path.exists(MODELS_FILE):
         try:
             with open(MODELS_FILE, 'r') as f:
-                return json.load(f)
+                return [auto] + json.load(f)
         except Exception as e:
             logger.warning(f"Failed to load models.json: {e}")
             pass
@@ -42,6 +38,10 @@ def get_available_models():
         {"display_name": "GPT-4o", "model_id": "openai/gpt-4o-latest"}
     ]
 
+def ensure_folders():
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+    os.makedirs(SPLIT_FOLDER, exist_ok=True)
+
 def allowed_file(filename):
     return filename.lower().endswith('.pdf')
 
@@ -50,6 +50,7 @@ def extract_race_number(text):
     return int(match.group(1)) if match else None
 
 def split_pdf_by_race(filepath, subname):
+    from PyPDF2 import PdfReader, PdfWriter
     subdir_path = os.path.join(SPLIT_FOLDER, subname)
     os.makedirs(subdir_path, exist_ok=True)
     reader = PdfReader(filepath)
@@ -76,9 +77,15 @@ def split_pdf_by_race(filepath, subname):
 
     return output_files
 
-def query_openrouter(model, text_content):
+def extract_pdf_text(file_path):
+    from PyPDF2 import PdfReader
+    reader = PdfReader(file_path)
+    return "\n".join([p.extract_text() for p in reader.pages])
+
+def analyze_text(model, text_content):
+    """Send race text to OpenRouter and return the analysis; raises on failure."""
     if not OPENROUTER_API_KEY:
-        return "Error: OPENROUTER_API_KEY not set in environment variables."
+        raise RuntimeError("OPENROUTER_API_KEY not set in environment variables.")
 
     logger.info(f"Sending request to OpenRouter using model: {model}")
 
@@ -98,17 +105,22 @@ def query_openrouter(model, text_content):
         ]
     }
 
+    result = chat_completion(headers, data)
+    return result['choices'][0]['message']['content']
+
+def query_openrouter(model, text_content):
+    if not OPENROUTER_API_KEY:
+        return "Error: OPENROUTER_API_KEY not set in environment variables."
+
     try:
-        response = requests.post("https://openrouter.ai/api/v1/chat/completions", headers=headers, json=data)
-        response.raise_for_status()
-        result = response.json()
-        return result['choices'][0]['message']['content']
+        return analyze_text(model, text_content)
     except Exception as e:
         logger.error(f"OpenRouter API Error: {e}")
         return f"API Error: {str(e)}"
 
 @split_bp.route('/', methods=['GET'])
 def index():
+    ensure_folders()
     subdirs = sorted([d for d in os.listdir(SPLIT_FOLDER) if os.path.isdir(os.path.join(SPLIT_FOLDER, d))])
     files = {d: sorted(os.listdir(os.path.join(SPLIT_FOLDER, d))) for d in subdirs}
     return render_template('horsepdf.html', models=[m['display_name'] for m in get_available_models()], directories=subdirs, files=files)
@@ -120,6 +132,7 @@ def upload():
         flash("Invalid file.")
         return redirect(url_for('split_bp.index'))
 
+    ensure_folders()
     filename = secure_filename(file.filename)
     path = os.path.join(UPLOAD_FOLDER, filename)
     file.save(path)
@@ -156,9 +169,8 @@ def process():
         text_content = ""
         for filename in selected_files:
             file_path = os.path.join(SPLIT_FOLDER, selected_dir, filename)
-            reader = PdfReader(file_path)
             text_content += f"\n\n--- {filename} ---\n"
-            text_content += "\n".join([p.extract_text() for p in reader.pages])
+            text_content += extract_pdf_text(file_path)
 
         if user_instructions:
             text_content = f"User instructions: {user_instructions}\n\n{text_content}"
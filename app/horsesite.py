@@ -2,23 +2,21 @@
 
 import os
 import json
-import logging
-import requests
 from datetime import date
 from flask import Blueprint, request, render_template, jsonify
 from markupsafe import Markup
-import markdown
 
-horsesite_bp = Blueprint('horsesite_bp', __name__, url_prefix='/horsesite')
+from app.openrouter import chat_completion
+from app.modelrouter import AUTO_MODEL
+from app.racecontext import race_contexts, race_key
 
-logging.basicConfig(level=logging.INFO)
+horsesite_bp = Blueprint('horsesite_bp', __name__, url_prefix='/horsesite')
 
 BASE_DIR = os.environ.get('BASE_DIR', os.getcwd())
 PROMPT_FILE = os.path.join(BASE_DIR, os.environ.get('PROMPT_FILE1', 'data/prompt_template1.txt'))
 JSON_PATH = os.path.join(BASE_DIR, os.environ.get('JSON_PATH', 'data/models.json'))
 
 OPENROUTER_API_KEY = os.environ.get('OPENROUTER_API_KEY')
-logging.info(f"API_KEY={OPENROUTER_API_KEY}")
 
 DEFAULT_PROMPT_TEMPLATE = """# {timestamp}
 
@@ -40,15 +38,18 @@ Race Number: {race_number}
 {user_insights}
 """
 
-def build_timestamp(race_date, race_number, race_info):
-    """Create 'YYYY-MM-DD • TRACK • Race X' timestamp."""
-    track = ""
-
+def extract_track(race_info):
+    """Track code from the first word of the race info, e.g. CD, GP, SA, AQU."""
     if race_info.strip():
-        first_line = race_info.strip().splitlines()[0]
-        parts = first_line.split()
+        parts = race_info.strip().splitlines()[0].split()
         if parts:
-            track = parts[0]  # e.g., CD, GP, SA, AQU
+            return parts[0].upper()
+    return ""
+
+
+def build_timestamp(race_date, race_number, race_info):
+    """Create 'YYYY-MM-DD • TRACK • Race X' timestamp."""
+    track = extract_track(race_info)
 
     timestamp_parts = []
     if race_date:
@@ -61,14 +62,15 @@ def build_timestamp(race_date, race_number, race_info):
     return " • ".join(timestamp_parts)
 
 
-def load_prompt_from_file(race_info, summary_data, pace_data, race_date, race_number, user_insights):
+def load_prompt_from_file(race_info, summary_data, pace_data, race_date, race_number, user_insights, timestamp=None):
     try:
         with open(PROMPT_FILE, 'r') as f:
             template = f.read()
     except Exception:
         template = DEFAULT_PROMPT_TEMPLATE
 
-    timestamp = build_timestamp(race_date, race_number, race_info)
+    if timestamp is None:
+        timestamp = build_timestamp(race_date, race_number, race_info)
 
     return template.format(
         timestamp=timestamp,
@@ -85,7 +87,7 @@ def load_models():
     try:
         with open(JSON_PATH, 'r') as f:
             models_data = json.load(f)
-        return [(m['display_name'], m['model_id']) for m in models_data]
+        return [AUTO_MODEL] + [(m['display_name'], m['model_id']) for m in models_data]
     except Exception:
         return [
             ("GPT-4o", "openai/gpt-4o"),
@@ -184,9 +186,16 @@ def index():
             error = "API Key not set."
         else:
             timestamp = build_timestamp(race_date, race_number, race_info)
+            # Race data goes in this user's per-race context; the prompt refers to it
+            # Only cache when date, track and race all identify the race
+            cacheable = race_date and extract_track(race_info) and race_number
+            context_messages, fields = race_contexts.prepare(
+                race_key(timestamp) if cacheable else None,
+                race_info=race_info, summary_data=summary_data, site_pace_data=pace_data
+            )
             prompt = load_prompt_from_file(
-                race_info, summary_data, pace_data,
-                race_date, race_number, user_insights
+                fields['race_info'], fields['summary_data'], fields['site_pace_data'],
+                race_date, race_number, user_insights, timestamp=timestamp
             )
 
             headers = {
@@ -198,24 +207,18 @@ def index():
 
             data = {
                 'model': selected_model,
-                'messages': [{'role': 'user', 'content': prompt}],
+                'messages': context_messages + [{'role': 'user', 'content': prompt}],
                 'temperature': 0.7,
                 'max_tokens': 4000
             }
 
             try:
-                response = requests.post(
-                    'https://openrouter.ai/api/v1/chat/completions',
-                    headers=headers,
-                    json=data
-                )
-                response.raise_for_status()
-
-                raw = response.json()['choices'][0]['message']['content']
+                raw = chat_completion(headers, data)['choices'][0]['message']['content']
 
                 # PREPEND TIMESTAMP TO MARKDOWN SHOWN IN horsesite.html
                 final_markdown = f"# {timestamp}\n\n" + raw
 
+                import markdown
                 result_html = Markup(markdown.markdown(final_markdown))
 
             except Exception as e:
@@ -0,0 +1,71 @@
+# horsetickets.py - Flask blueprint that builds exotic tickets (exacta,
+#                   trifecta, pick-3/4/5) locally from per-horse probabilities
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+
+import math
+from flask import Blueprint, request, render_template
+
+horsetickets_bp = Blueprint('horsetickets_bp', __name__, url_prefix='/horsetickets')
+
+MAX_LEGS = 5
+MAX_COMBOS_SHOWN = 50
+
+
+@horsetickets_bp.route('/', methods=['GET', 'POST'])
+def index():
+    first_race = '1'
+    budget = '100'
+    base_bet = '1.00'
+    legs_text = [''] * MAX_LEGS
+    tickets = None
+    elapsed_ms = None
+    error = None
+
+    if request.method == 'POST':
+        first_race = request.form.get('first_race', first_race).strip()
+        budget = request.form.get('budget', budget).strip()
+        base_bet = request.form.get('base_bet', base_bet).strip()
+        legs_text = [request.form.get(f'leg{i}', '') for i in range(MAX_LEGS)]
+
+        try:
+            race = int(first_race)
+            budget_value = float(budget)
+            base_value = float(base_bet)
+        except ValueError:
+            race = budget_value = base_value = None
+
+        if (race is None or not math.isfinite(budget_value) or not math.isfinite(base_value)
+                or budget_value <= 0 or base_value <= 0):
+            error = "Race number, budget and base bet must be positive numbers."
+        else:
+            from app.tickets import parse_leg, build_tickets  # numpy only loads when tickets are built
+
+            legs = []
+            for i, text in enumerate(legs_text):
+                if not text.strip():
+                    break
+                leg = parse_leg(race + i, text)
+                if leg is None:
+                    error = f"No horse probabilities or odds found for Race {race + i}."
+                    break
+                legs.append(leg)
+
+            if not error and not legs:
+                error = "Please enter at least one race."
+            elif not error:
+                tickets, elapsed = build_tickets(legs, budget_value, base_value)
+                elapsed_ms = elapsed * 1000
+
+    return render_template(
+        'horsetickets.html',
+        first_race=first_race,
+        budget=budget,
+        base_bet=base_bet,
+        legs_text=legs_text,
+        tickets=tickets,
+        elapsed_ms=elapsed_ms,
+        max_combos_shown=MAX_COMBOS_SHOWN,
+        error=error
+    )
@@ -15,6 +15,8 @@ SPLIT_FOLDER = 'split_races'
 
 @manage_bp.route('/', methods=['GET'])
 def index():
+    if not os.path.isdir(SPLIT_FOLDER):
+        return render_template('manage.html', subdirs=[])
     subdirs = sorted([d for d in os.listdir(SPLIT_FOLDER) if os.path.isdir(os.path.join(SPLIT_FOLDER, d))])
     return render_template('manage.html', subdirs=subdirs)
 
@@ -0,0 +1,203 @@
+# modelrouter.py - picks a model for the "auto" choice from the latency,
+#                  error rate and cost observed on real OpenRouter calls
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+
+import os
+import math
+import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.environ.get('BASE_DIR', os.getcwd())
+JSON_PATH = os.path.join(BASE_DIR, os.environ.get('JSON_PATH', 'data/models.json'))
+
+AUTO_MODEL_ID = 'auto'
+AUTO_MODEL = ("Auto (fastest healthy model)", AUTO_MODEL_ID)
+
+WINDOW = 20                 # calls kept per model for the rolling numbers
+MIN_SAMPLES = 5             # calls needed before the error rate can trip a model
+MAX_ERROR_RATE = 0.5        # rolling error rate that takes a model out of rotation
+MAX_CONSECUTIVE_FAILURES = 3
+SLOW_SECONDS = float(os.environ.get('ROUTER_SLOW_SECONDS', 120))
+COOLDOWN_SECONDS = 60.0     # first time out; doubles on repeat trips up to MAX_COOLDOWN_SECONDS
+RATE_LIMIT_SECONDS = 10.0   # back-off after a 429 that doesn't say how long (Retry-After)
+MAX_COOLDOWN_SECONDS = 900.0
+LATENCY_TOLERANCE = 2.0     # models this close in seconds are ranked by cost instead
+EXPLORE_RATE = 0.1          # share of auto requests sent first to a model that isn't the current best
+STALE_SECONDS = 1800.0      # numbers older than this are re-checked first when exploring
+DEFAULT_CONTEXT_LENGTH = 128000
+
+
+def estimate_tokens(data):
+    """Rough prompt + completion token count for a chat completion body."""
+    chars = 0
+    for m in data.get('messages', []):
+        content = m.get('content', '')
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(part.get('text', '')) for part in content)
+    return chars // 4 + data.get('max_tokens', 4000)
+
+
+class ModelStats:
+    """Rolling latency / error / cost numbers for one model."""
+
+    def __init__(self):
+        self.calls = deque(maxlen=WINDOW)   # (latency seconds, ok)
+        self.cost = deque(maxlen=WINDOW)    # (usd, tokens)
+        self.consecutive_failures = 0
+        self.cooldown = COOLDOWN_SECONDS
+        self.unhealthy_until = 0.0
+        self.last_call = None
+
+    def latency(self):
+        ok = [lat for lat, success in self.calls if success]
+        return sum(ok) / len(ok) if ok else None
+
+    def error_rate(self):
+        if not self.calls:
+            return 0.0
+        return sum(1 for _, success in self.calls if not success) / len(self.calls)
+
+    def cost_per_token(self):
+        tokens = sum(t for _, t in self.cost)
+        return sum(usd for usd, _ in self.cost) / tokens if tokens else None
+
+    def healthy(self, now):
+        return now >= self.unhealthy_until
+
+
+class ModelRouter:
+    def __init__(self, json_path=JSON_PATH):
+        self.json_path = json_path
+        self.stats = {}
+        self.lock = threading.Lock()
+        self.models = []
+        self.models_mtime = None
+
+    def load_models(self):
+        """models.json entries, re-read only when the file changes."""
+        try:
+            mtime = os.path.getmtime(self.json_path)
+            if mtime != self.models_mtime:
+                with open(self.json_path, 'r') as f:
+                    self.models = json.load(f)
+                self.models_mtime = mtime
+        except Exception as e:
+            logger.warning(f"Model router could not read {self.json_path}: {e}")
+            self.models, self.models_mtime = [], None
+        return self.models
+
+    def _stats(self, model_id):
+        if model_id not in self.stats:
+            self.stats[model_id] = ModelStats()
+        return self.stats[model_id]
+
+    def candidates(self, tokens_needed):
+        """Healthy model ids that fit tokens_needed, best first.
+
+        Untried models come first, so each one is tried before the router
+        settles; the rest are ranked fastest first, with cost breaking near
+        ties. EXPLORE_RATE of the time a model other than the best (stale
+        ones first) is moved to the front so its numbers stay current.
+        Models that are cooling down or backing off go last, soonest due back
+        first, as a last resort rather than failing the request.
+        """
+        models = self.load_models()
+        now = time.monotonic()
+        ranked, stale, benched = [], [], []
+        with self.lock:
+            for position, m in enumerate(models):
+                model_id = m['model_id']
+                if m.get('context_length', DEFAULT_CONTEXT_LENGTH) < tokens_needed:
+                    continue
+                s = self._stats(model_id)
+                if not s.healthy(now):
+                    benched.append((s.unhealthy_until, s.error_rate(), position, model_id))
+                    continue
+                latency = s.latency()
+                cost = s.cost_per_token()
+                ranked.append((s.last_call is not None,
+                               int(latency / LATENCY_TOLERANCE) if latency is not None else math.inf,
+                               cost if cost is not None else math.inf,
+                               position, model_id))
+                if s.last_call is None or now - s.last_call > STALE_SECONDS:
+                    stale.append(model_id)
+        ranked = [r[-1] for r in sorted(ranked)]
+
+        if len(ranked) > 1 and random.random() < EXPLORE_RATE:
+            others = [m for m in ranked[1:] if m in stale] or ranked[1:]
+            pick = random.choice(others)
+            ranked.remove(pick)
+            ranked.insert(0, pick)
+        return ranked + [b[-1] for b in sorted(benched)]
+
+    def record(self, model_id, latency, ok, usage=None):
+        """Record the outcome of one real call and trip the model if it degraded."""
+        tokens, usd = self._usage_cost(model_id, usage) if ok else (0, 0.0)
+        with self.lock:
+            s = self._stats(model_id)
+            s.calls.append((latency, ok))
+            s.last_call = time.monotonic()
+            if ok:
+                s.consecutive_failures = 0
+                if tokens:
+                    s.cost.append((usd, tokens))
+            else:
+                s.consecutive_failures += 1
+
+            reason = None
+            if s.consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                reason = f"{s.consecutive_failures} consecutive failures"
+            elif len(s.calls) >= MIN_SAMPLES and s.error_rate() >= MAX_ERROR_RATE:
+                reason = f"error rate {s.error_rate():.0%}"
+            elif ok and latency > SLOW_SECONDS:
+                reason = f"slow response {latency:.1f}s"
+
+            if reason:
+                s.unhealthy_until = time.monotonic() + s.cooldown
+                logger.warning(f"Model router: {model_id} out of rotation for {s.cooldown:.0f}s ({reason})")
+                s.cooldown = min(s.cooldown * 2, MAX_COOLDOWN_SECONDS)
+                s.consecutive_failures = 0
+                # Start over when it comes back so one good call can't be outvoted by old failures
+                s.calls.clear()
+            elif ok and s.error_rate() < MAX_ERROR_RATE / 2:
+                s.cooldown = COOLDOWN_SECONDS
+
+    def back_off(self, model_id, seconds):
+        """Keep a rate limited (429) model out of rotation for seconds.
+
+        Not a failure: its error rate, consecutive failures and cooldown are
+        left alone.
+        """
+        with self.lock:
+            s = self._stats(model_id)
+            s.unhealthy_until = max(s.unhealthy_until, time.monotonic() + seconds)
+        logger.info(f"Model router: {model_id} rate limited, backing off for {seconds:.0f}s")
+
+    def _usage_cost(self, model_id, usage):
+        """(tokens, usd) from an OpenRouter usage block, falling back to models.json prices."""
+        if not usage:
+            return 0, 0.0
+        prompt_tokens = usage.get('prompt_tokens', 0)
+        completion_tokens = usage.get('completion_tokens', 0)
+        tokens = usage.get('total_tokens', prompt_tokens + completion_tokens)
+        if 'cost' in usage:
+            return tokens, float(usage['cost'])
+        model = next((m for m in self.load_models() if m['model_id'] == model_id), {})
+        # models.json prices are USD per million tokens
+        usd = (prompt_tokens * model.get('prompt_price', 0) +
+               completion_tokens * model.get('completion_price', 0)) / 1e6
+        return tokens, usd
+
+
+router = ModelRouter()
@@ -0,0 +1,146 @@
+# openrouter.py - shared OpenRouter chat completion call used by all the
+#                 blueprints, with coalescing of identical in-flight requests
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+
+import os
+import json
+import hashlib
+import logging
+import time
+import threading
+from email.utils import parsedate_to_datetime
+
+from app.modelrouter import router, AUTO_MODEL_ID, RATE_LIMIT_SECONDS, estimate_tokens
+from app.racecontext import with_cache_breakpoint
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_BASE_URL = os.environ.get('OPENROUTER_BASE_URL', 'https://openrouter.ai/api/v1').rstrip('/')
+OPENROUTER_TIMEOUT = float(os.environ.get('OPENROUTER_TIMEOUT', 300))
+
+# Key / credit problems are ours, not the model's: don't count them against it or fail over
+ACCOUNT_ERRORS = {401, 402, 403}
+RATE_LIMITED = 429
+
+
+class _InFlight:
+    """A pending upstream call that identical requests can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def request_key(data):
+    """(model, hash of everything else in the request body)."""
+    body = {k: v for k, v in data.items() if k != 'model'}
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest()
+    return data.get('model'), digest
+
+
+def status_code(error):
+    response = getattr(error, 'response', None)
+    return response.status_code if response is not None else None
+
+
+def is_account_error(error):
+    return status_code(error) in ACCOUNT_ERRORS
+
+
+def retry_after(response):
+    """Seconds to wait from a Retry-After header (seconds or HTTP date)."""
+    value = response.headers.get('Retry-After', '')
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return RATE_LIMIT_SECONDS
+
+
+def _post(headers, data):
+    """One upstream call; the outcome is fed to the model router."""
+    # Ask OpenRouter to report the cost of the call in the usage block
+    data = dict(with_cache_breakpoint(data), usage={'include': True})
+    import requests
+    start = time.perf_counter()
+    try:
+        response = requests.post(f'{OPENROUTER_BASE_URL}/chat/completions', headers=headers,
+                                 json=data, timeout=OPENROUTER_TIMEOUT)
+        response.raise_for_status()
+        result = response.json()
+    except Exception as e:
+        status = status_code(e)
+        if status == RATE_LIMITED:
+            router.back_off(data['model'], retry_after(e.response))
+        elif status not in ACCOUNT_ERRORS:
+            router.record(data['model'], time.perf_counter() - start, False)
+        raise
+    router.record(data['model'], time.perf_counter() - start, True, result.get('usage'))
+    return result
+
+
+def _send(headers, data):
+    """Send to the requested model, or route an "auto" request with failover."""
+    if data.get('model') != AUTO_MODEL_ID:
+        return _post(headers, data)
+
+    candidates = router.candidates(estimate_tokens(data))
+    if not candidates:
+        raise RuntimeError("No model in models.json can take this request for automatic selection.")
+
+    last_error = None
+    for model_id in candidates:
+        logger.info(f"Auto model selection trying {model_id}")
+        try:
+            return _post(headers, dict(data, model=model_id))
+        except Exception as e:
+            if is_account_error(e):
+                raise
+            logger.warning(f"{model_id} failed, failing over: {e}")
+            last_error = e
+    raise last_error
+
+
+def chat_completion(headers, data):
+    """POST a chat completion and return the parsed JSON response.
+
+    If an identical request (same model and prompt) is already on its way to
+    OpenRouter, wait for that call and share its result (or its exception)
+    instead of sending a duplicate. A model of "auto" lets the model router
+    pick, failing over to the next healthy model on errors.
+    """
+    key = request_key(data)
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _InFlight()
+
+    if not leader:
+        logger.info(f"Coalescing duplicate request for model {key[0]}")
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = _send(headers, data)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        call.done.set()
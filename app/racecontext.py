@@ -0,0 +1,147 @@
+# racecontext.py - per user and race (date, track, race) store of the race
+#                  data that has been sent to the LLM, shared by the blueprints
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+#
+# The race data pasted into /horsesite, /horseinput and /horsepools is kept
+# per browser session and build_timestamp() key, so one user's data never
+# reaches another user's prompt, and sent as one stable system message ahead of
+# the prompt. The prompt itself only refers to that data (and says which
+# sections changed since the last call), so repeated calls on the same race
+# share an identical prefix that providers can serve from their prompt cache.
+
+import time
+import copy
+import uuid
+import threading
+from collections import OrderedDict
+from flask import session
+
+MAX_RACES = 64
+RACE_TTL_SECONDS = 18 * 3600
+
+SECTION_TITLES = {
+    'race_info': 'Race Information',
+    'summary_data': 'Summary Data',
+    'site_pace_data': 'Pace Data (Horse Data Processor)',
+    'speed_data': 'Speed Data',
+    'class_data': 'Class Data',
+    'input_pace_data': 'Pace Data (Manual Input)',
+    'pools_data': 'Pools Data',
+}
+
+NEW_REFERENCE = "(see the race context provided above)"
+UNCHANGED_REFERENCE = "(unchanged, see the race context provided above)"
+UPDATED_REFERENCE = "(updated since the last analysis, see the race context provided above)"
+
+# OpenRouter passes explicit cache_control breakpoints on to these providers;
+# the others cache identical prompt prefixes automatically.
+CACHE_CONTROL_PREFIXES = ('anthropic/', 'google/gemini')
+
+
+def race_key(timestamp):
+    """Store key for this browser session's race: (session id, timestamp)."""
+    if 'race_session' not in session:
+        session['race_session'] = uuid.uuid4().hex
+    return session['race_session'], timestamp
+
+
+class RaceContext:
+    def __init__(self, key):
+        self.key = key
+        self.title = key[-1]
+        self.sections = OrderedDict()   # field name -> text, first seen first
+        self.touched = time.monotonic()
+
+    def messages(self):
+        parts = [{'type': 'text', 'text': f"# Race context: {self.title}\n\n"
+                  "The race data below is referred to by the request that follows."}]
+        for field, text in self.sections.items():
+            parts.append({'type': 'text', 'text': f"## {SECTION_TITLES[field]}\n{text}"})
+        return [{'role': 'system', 'content': parts}]
+
+
+class RaceContextStore:
+    def __init__(self, max_races=MAX_RACES, ttl=RACE_TTL_SECONDS):
+        self.max_races = max_races
+        self.ttl = ttl
+        self.races = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get(self, key, now):
+        context = self.races.get(key)
+        if context is not None and now - context.touched > self.ttl:
+            context = None
+        if context is None:
+            context = self.races[key] = RaceContext(key)
+        self.races.move_to_end(key)
+        context.touched = now
+        while len(self.races) > self.max_races:
+            self.races.popitem(last=False)
+        return context
+
+    def prepare(self, key, **fields):
+        """Merge this request's race data into the race's context.
+
+        Returns (context messages, prompt fields): the system message(s) to
+        send ahead of the prompt, and the fields to format the prompt
+        template with, where every section held in the context is replaced
+        by a short reference. The sections this request sends replace the
+        stored ones, and a section sent empty is dropped. Sections the same
+        user sent from other blueprints are kept. key comes from race_key();
+        without one nothing is cached and the fields come back unchanged.
+        Callers only pass one when date, track and race number are all known.
+        """
+        if not key:
+            return [], fields
+
+        with self.lock:
+            context = self._get(key, time.monotonic())
+            added, changed = set(), set()
+            for field, text in fields.items():
+                if field not in SECTION_TITLES:
+                    continue
+                if not text:
+                    context.sections.pop(field, None)
+                    continue
+                if field not in context.sections:
+                    added.add(field)
+                elif context.sections[field] != text:
+                    changed.add(field)
+                context.sections[field] = text
+
+            if not context.sections:
+                return [], fields
+
+            prompt_fields = dict(fields)
+            for field in context.sections:
+                if field in added:
+                    prompt_fields[field] = NEW_REFERENCE
+                elif field in changed:
+                    prompt_fields[field] = UPDATED_REFERENCE
+                else:
+                    prompt_fields[field] = UNCHANGED_REFERENCE
+            return context.messages(), prompt_fields
+
+
+def with_cache_breakpoint(data):
+    """Copy of a request body with cache_control breakpoints on the race
+    context sections, for providers that need them marked explicitly.
+
+    Marking each section (Anthropic allows four breakpoints) means a change
+    to a later section still reuses the cached sections ahead of it.
+    """
+    if not data.get('model', '').startswith(CACHE_CONTROL_PREFIXES):
+        return data
+    messages = data.get('messages', [])
+    if not messages or messages[0].get('role') != 'system' or not isinstance(messages[0].get('content'), list):
+        return data
+    data = dict(data, messages=copy.deepcopy(messages))
+    for part in data['messages'][0]['content'][1:][-4:]:
+        part['cache_control'] = {'type': 'ephemeral'}
+    return data
+
+
+race_contexts = RaceContextStore()
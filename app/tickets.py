@@ -0,0 +1,211 @@
+# tickets.py - exotic ticket construction from per-horse win probabilities
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+#
+# Every exacta / trifecta combination in a race and every pick-3/4/5
+# combination across consecutive races is scored with numpy array products:
+#
+#   our probability  p  - from the handicapper (LLM analysis or typed in)
+#   public probability q - from the tote / morning line odds (p if no odds)
+#   est. payout per $1   = (1 - takeout) / q
+#   expected return / $1 = p * payout
+#
+# Exacta/trifecta probabilities use the Harville model, pick-N the product
+# of the leg win probabilities. A ticket is the set of best expected return
+# combinations that fits the budget, keeping only overlays.
+
+import re
+import time
+from functools import reduce
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+TAKEOUT = {
+    'exacta': 0.19,
+    'trifecta': 0.25,
+    'pick3': 0.24,
+    'pick4': 0.24,
+    'pick5': 0.24,
+}
+
+MIN_PROB = 0.02             # horses below this win probability are pruned
+MIN_EXPECTED_RETURN = 1.0   # only overlays (expected return per $1 above this) go on a ticket
+MAX_COMBOS = 2_000_000      # prune the weakest horses further if a pick-N grid would be bigger
+
+HORSE_RE = re.compile(r'^\W*#?\s*(\d{1,2}[A-Za-z]?)\b(.*)$')
+PERCENT_RE = re.compile(r'(\d+(?:\.\d+)?)\s*%')
+DECIMAL_RE = re.compile(r'(?<![\d.-])(0?\.\d+)(?![\d%])')
+ODDS_RE = re.compile(r'(\d+(?:\.\d+)?)\s*[-/]\s*(\d+(?:\.\d+)?)')
+
+
+class Leg:
+    """One race: program numbers with our and the public's win probability."""
+
+    def __init__(self, race, programs, p, q):
+        self.race = race
+        self.programs = programs
+        self.p = p
+        self.q = q
+
+    def pruned(self, min_prob):
+        keep = self.p >= min_prob
+        return Leg(self.race, [h for h, k in zip(self.programs, keep) if k], self.p[keep], self.q[keep])
+
+
+def parse_leg(race, text):
+    """Parse one race's horses from pasted text.
+
+    One horse per line: a program number first, then a win probability as
+    a percentage (25%) or decimal (0.25), and optionally odds (5-2 or 5/2).
+    Lines like "2. #7 Horse Name - 30%" from an LLM analysis work too.
+    Returns None when no line has a probability or odds.
+    """
+    horses = {}
+    for line in text.splitlines():
+        line = re.sub(r'^\s*\d+\.\s+(?=#)', '', line)   # drop "1. " list numbering before "#7"
+        match = HORSE_RE.match(line)
+        if not match:
+            continue
+        program, rest = match.group(1).upper(), match.group(2)
+        prob = None
+        if PERCENT_RE.search(rest):
+            prob = float(PERCENT_RE.search(rest).group(1)) / 100
+        elif DECIMAL_RE.search(rest):
+            prob = float(DECIMAL_RE.search(rest).group(1))
+        odds = ODDS_RE.search(rest)
+        public = None
+        if odds and float(odds.group(2)) > 0:
+            public = 1.0 / (1.0 + float(odds.group(1)) / float(odds.group(2)))
+        if prob is None and public is None:
+            continue
+        if program not in horses:
+            horses[program] = (prob, public)
+
+    if not horses:
+        return None
+
+    programs = list(horses)
+    p = np.array([v[0] if v[0] is not None else np.nan for v in horses.values()])
+    q = np.array([v[1] if v[1] is not None else np.nan for v in horses.values()])
+    # Odds carry the track's take: scale the public line to a 100% book
+    if not np.isnan(q).all():
+        q = q / np.nansum(q) if np.nansum(q) > 1 else q
+    p = np.where(np.isnan(p), q, p)
+    q = np.where(np.isnan(q), p, q)
+    if p.sum() > 1:
+        p = p / p.sum()
+    return Leg(race, programs, p, q)
+
+
+def _select(expected, budget, base):
+    """Indexes (into the flattened arrays) of the ticket: best overlays that fit the budget."""
+    count = int(budget // base)
+    flat = expected.ravel()
+    candidates = np.flatnonzero(flat > MIN_EXPECTED_RETURN)
+    if count <= 0 or candidates.size == 0:
+        return candidates[:0]
+    if candidates.size > count:
+        top = np.argpartition(flat[candidates], -count)[-count:]
+        candidates = candidates[top]
+    return candidates[np.argsort(-flat[candidates])]
+
+
+def _ticket(bet, races, legs_programs, shape, expected, p_combo, budget, base):
+    chosen = _select(expected, budget, base)
+    combos = [tuple(legs_programs[i][j] for i, j in enumerate(idx))
+              for idx in zip(*np.unravel_index(chosen, shape))]
+    hit = float(p_combo.ravel()[chosen].sum())
+    returns = float((expected.ravel()[chosen] * base).sum())
+    cost = len(combos) * base
+    used = [sorted({c[i] for c in combos}, key=legs_programs[i].index) for i in range(len(shape))] \
+        if bet.startswith('pick') else []
+    return {
+        'bet': bet,
+        'races': races,
+        'combos': ['-'.join(c) for c in combos],
+        'legs_used': used,
+        'cost': cost,
+        'hit_prob': hit,
+        'expected_return': returns,
+        'expected_profit': returns - cost,
+        'roi': (returns - cost) / cost if cost else 0.0,
+        'considered': int(np.prod(shape)),
+    }
+
+
+def exacta(leg, budget, base):
+    n = len(leg.programs)
+    if n < 2:
+        return None
+    p, q = leg.p, leg.q
+    # Harville: P(a first, b second) = p_a * p_b / (1 - p_a)
+    P = p[:, None] * p[None, :] / np.clip(1 - p[:, None], 1e-9, None)
+    Q = q[:, None] * q[None, :] / np.clip(1 - q[:, None], 1e-9, None)
+    np.fill_diagonal(P, 0)
+    np.fill_diagonal(Q, 1)
+    expected = P * (1 - TAKEOUT['exacta']) / Q
+    return _ticket('exacta', [leg.race], [leg.programs] * 2, P.shape, expected, P, budget, base)
+
+
+def trifecta(leg, budget, base):
+    n = len(leg.programs)
+    if n < 3:
+        return None
+    p, q = leg.p, leg.q
+
+    def harville(v):
+        a = v[:, None, None]
+        b = v[None, :, None]
+        c = v[None, None, :]
+        return a * b / np.clip(1 - a, 1e-9, None) * c / np.clip(1 - a - b, 1e-9, None)
+
+    i, j, k = np.indices((n, n, n))
+    distinct = (i != j) & (j != k) & (i != k)
+    P = np.where(distinct, harville(p), 0.0)
+    Q = np.where(distinct, harville(q), 1.0)
+    expected = P * (1 - TAKEOUT['trifecta']) / Q
+    return _ticket('trifecta', [leg.race], [leg.programs] * 3, P.shape, expected, P, budget, base)
+
+
+def pick_n(legs, budget, base):
+    bet = f'pick{len(legs)}'
+    # Keep the full grid bounded by raising the pruning floor
+    min_prob = MIN_PROB
+    while np.prod([len(l.programs) for l in legs], dtype=float) > MAX_COMBOS:
+        min_prob *= 1.5
+        legs = [l.pruned(min_prob) for l in legs]
+    if any(len(l.programs) == 0 for l in legs):
+        return None
+    # Outer product over the legs: P[i, j, k, ...] = p1[i] * p2[j] * p3[k] ...
+    P = reduce(np.multiply, np.ix_(*[l.p for l in legs]))
+    Q = reduce(np.multiply, np.ix_(*[l.q for l in legs]))
+    expected = P * (1 - TAKEOUT[bet]) / Q
+    return _ticket(bet, [l.race for l in legs], [l.programs for l in legs], P.shape, expected, P, budget, base)
+
+
+def build_tickets(legs, budget, base=1.0):
+    """Best-value ticket for each exacta/trifecta race and pick-3/4/5 sequence.
+
+    legs are consecutive races (Leg objects). Returns (tickets sorted by
+    expected profit, seconds taken).
+    """
+    start = time.perf_counter()
+    legs = [leg.pruned(MIN_PROB) for leg in legs]
+
+    jobs = []
+    for leg in legs:
+        jobs.append((exacta, leg))
+        jobs.append((trifecta, leg))
+    for n in (3, 4, 5):
+        for first in range(len(legs) - n + 1):
+            jobs.append((pick_n, legs[first:first + n]))
+
+    # numpy releases the GIL for the big array products
+    with ThreadPoolExecutor() as pool:
+        results = list(pool.map(lambda job: job[0](job[1], budget, base), jobs))
+
+    tickets = [t for t in results if t and t['combos']]
+    tickets.sort(key=lambda t: t['expected_profit'], reverse=True)
+    return tickets, time.perf_counter() - start
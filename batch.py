@@ -0,0 +1,147 @@
+# batch.py - headless command line entry point for processing a folder of
+#            past performance pdf files without going through the web pages
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+#
+# Each card is split into its races (same split_races/<card> layout the
+# /pdfPP page uses), the text of each race is extracted and sent to
+# OpenRouter. Results are written one JSON object per race (JSON Lines).
+#
+#   python batch.py cards/ -o results.jsonl --model "Grok 4.1 Fast"
+#   python batch.py cards/ -o timings.jsonl --dry-run
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dotenv import load_dotenv
+load_dotenv('./.env')
+
+from app.horsepdf import (
+    SPLIT_FOLDER, OPENROUTER_API_KEY, get_available_models, allowed_file,
+    split_pdf_by_race, extract_pdf_text, analyze_text
+)
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_model(name):
+    """Accept either a display name or a model id from models.json."""
+    models = get_available_models()
+    if not name:
+        return models[0]['model_id']
+    for m in models:
+        if name in (m['display_name'], m['model_id']):
+            return m['model_id']
+    return None
+
+
+def split_card(pdf_path):
+    """Split one card; returns (card name, [race pdf paths])."""
+    card = os.path.splitext(os.path.basename(pdf_path))[0]
+    race_files = split_pdf_by_race(pdf_path, card)
+    return card, [os.path.join(SPLIT_FOLDER, card, f) for f in race_files]
+
+
+def process_race(card, race_path, model_id, instructions, dry_run):
+    """Extract one race and (unless dry_run) query the LLM; returns a result dict."""
+    race_file = os.path.basename(race_path)
+    record = {"card": card, "race_file": race_file, "model": model_id}
+
+    start = time.perf_counter()
+    text_content = f"\n\n--- {race_file} ---\n" + extract_pdf_text(race_path)
+    if instructions:
+        text_content = f"User instructions: {instructions}\n\n{text_content}"
+    record["extract_seconds"] = round(time.perf_counter() - start, 4)
+    record["text_chars"] = len(text_content)
+
+    if dry_run:
+        record["response"] = None
+        return record
+
+    start = time.perf_counter()
+    try:
+        record["response"] = analyze_text(model_id, text_content)
+    except Exception as e:
+        record["response"] = None
+        record["error"] = str(e)
+    record["llm_seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Split and analyze a directory of past performance PDFs.")
+    parser.add_argument('input_dir', help="directory containing card PDFs")
+    parser.add_argument('-o', '--output', default='-', help="JSON Lines output file (default: stdout)")
+    parser.add_argument('-m', '--model', help="model display name or id (default: auto)")
+    parser.add_argument('-i', '--instructions', default='', help="extra user instructions added to every race")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help="worker processes (default: cpu count)")
+    parser.add_argument('--dry-run', action='store_true', help="split and extract only, do not call the LLM")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    model_id = resolve_model(args.model)
+    if not model_id:
+        parser.error(f"model not found in models.json: {args.model}")
+    if not args.dry_run and not OPENROUTER_API_KEY:
+        parser.error("OPENROUTER_API_KEY not set in environment variables (use --dry-run to skip the LLM)")
+
+    pdfs = sorted(
+        os.path.join(args.input_dir, f) for f in os.listdir(args.input_dir)
+        if allowed_file(f)
+    )
+    if not pdfs:
+        parser.error(f"no PDF files found in {args.input_dir}")
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    start = time.perf_counter()
+    races = errors = 0
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            split_jobs = {pool.submit(split_card, p): p for p in pdfs}
+            race_jobs = {}
+            for job in as_completed(split_jobs):
+                try:
+                    card, race_paths = job.result()
+                except Exception as e:
+                    logger.error(f"Split failed for {split_jobs[job]}: {e}")
+                    errors += 1
+                    continue
+                for race_path in race_paths:
+                    fut = pool.submit(process_race, card, race_path, model_id, args.instructions, args.dry_run)
+                    race_jobs[fut] = (card, race_path)
+
+            for job in as_completed(race_jobs):
+                card, race_path = race_jobs[job]
+                try:
+                    record = job.result()
+                except Exception as e:
+                    logger.error(f"Processing failed for {race_path}: {e}")
+                    record = {"card": card, "race_file": os.path.basename(race_path),
+                              "model": model_id, "error": str(e)}
+                    errors += 1
+                else:
+                    if "error" in record:
+                        logger.error(f"LLM call failed for {race_path}: {record['error']}")
+                        errors += 1
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                races += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Processed {len(pdfs)} cards / {races} races in {elapsed:.2f}s "
+                f"({races / elapsed if elapsed else 0:.1f} races/s), {errors} errors")
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
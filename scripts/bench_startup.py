@@ -0,0 +1,94 @@
+# bench_startup.py - cold start benchmark for the portal with import time
+#                    profiling, failing when startup goes over a target
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+#
+# Each run starts a fresh interpreter with -X importtime, imports main (which
+# builds the app) and reports the time taken. The slowest imports of the
+# median run are listed, along with what the libraries deferred to first use
+# (PyPDF2, markdown, requests, numpy) would cost if they were imported up front.
+#
+#   python scripts/bench_startup.py --runs 7 --target-ms 250
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import main
+startup = time.perf_counter() - start
+before = set(sys.modules)
+start = time.perf_counter()
+import PyPDF2, markdown, requests, numpy
+deferred = time.perf_counter() - start
+print(json.dumps({'startup_ms': startup * 1000, 'deferred_ms': deferred * 1000,
+                  'deferred_loaded_at_startup': sorted({'PyPDF2', 'markdown', 'requests', 'numpy'} & before)}))
+"""
+
+
+def parse_importtime(stderr):
+    """[(cumulative us, self us, module)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def run_once():
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=PROJECT_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        sys.exit(f"Startup probe failed:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    # Only the imports made while building the app, not the deferred probe
+    imports = parse_importtime(proc.stderr)
+    cut = next((i for i, row in enumerate(imports) if row[2].strip() == 'main'), len(imports) - 1)
+    result['imports'] = imports[:cut + 1]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold start benchmark for the horse portal.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--target-ms', type=float, default=250.0, help="fail if median startup is slower")
+    parser.add_argument('--top', type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args(argv)
+
+    runs = sorted((run_once() for _ in range(args.runs)), key=lambda r: r['startup_ms'])
+    median = runs[len(runs) // 2]
+    startups = [r['startup_ms'] for r in runs]
+
+    print(f"startup (import main, {args.runs} runs): median {statistics.median(startups):.1f} ms, "
+          f"min {min(startups):.1f} ms, max {max(startups):.1f} ms")
+    print(f"deferred to first use (PyPDF2, markdown, requests, numpy): {median['deferred_ms']:.1f} ms")
+    if median['deferred_loaded_at_startup']:
+        print(f"WARNING: imported at startup anyway: {', '.join(median['deferred_loaded_at_startup'])}")
+
+    print("\nslowest imports (median run, cumulative):")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative, self_us, name in sorted(median['imports'], reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>14.1f}{self_us / 1000:>10.1f}  {name}")
+
+    if statistics.median(startups) > args.target_ms:
+        print(f"\nFAIL: median startup {statistics.median(startups):.1f} ms is over the {args.target_ms:.0f} ms target")
+        return 1
+    print(f"\nOK: median startup under the {args.target_ms:.0f} ms target")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# loadtest.py - drives every blueprint of a running portal concurrently and
+#               reports throughput and p50/p95/p99 latency per endpoint
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+#
+# Start the mock LLM and point the app at it first:
+#
+#   python scripts/mock_openrouter.py --latency 800 &
+#   OPENROUTER_BASE_URL=http://127.0.0.1:5600/api/v1 OPENROUTER_API_KEY=mock flask run &
+#   python scripts/loadtest.py --url http://127.0.0.1:5500 --concurrency 16 --duration 30
+#
+# /pdfPP/process is only exercised when --pdf-dir/--pdf-race name a card that
+# has already been split (e.g. with batch.py --dry-run).
+
+import time
+import random
+import argparse
+import threading
+from datetime import date
+from collections import defaultdict
+import requests
+
+RACE_DATE = date.today().isoformat()
+
+# 12-horse field: (win %, morning line odds)
+TICKET_FIELD = [(24, '5-2'), (18, '3-1'), (14, '4-1'), (11, '6-1'), (8, '8-1'), (7, '10-1'),
+                (5, '12-1'), (4, '15-1'), (3, '20-1'), (3, '20-1'), (2, '30-1'), (1, '50-1')]
+
+
+def ticket_leg(n):
+    """One 12-horse race for /horsetickets, our favourite rotated by n."""
+    probs = [p for p, _ in TICKET_FIELD]
+    probs = probs[n % 12:] + probs[:n % 12]
+    return "\n".join(f"{i + 1} {p}% {odds}" for i, (p, (_, odds)) in enumerate(zip(probs, TICKET_FIELD)))
+
+
+def build_scenarios(args):
+    """Return [(name, method, path, form data)] covering every blueprint."""
+    scenarios = [
+        ('horsesite', 'POST', '/horsesite/', lambda n: {
+            'race_info': f"CD Race {n % 12 + 1} 6 Furlongs Dirt",
+            'summary_data': "1 Horse A 95 92 90\n2 Horse B 91 89 93\n3 Horse C 88 90 87",
+            'pace_data': "1 E 98\n2 P 91\n3 S 85",
+            'user_insights': '',
+            'race_date': RACE_DATE,
+            'race_number': str(n % 12 + 1),
+            'model': args.model,
+        }),
+        ('horsesite.extract', 'POST', '/horsesite/extract', lambda n: {
+            'summary_data': "Summary\nHelp us improve Summary\nRACE STATS\nCD 6f Dirt",
+            'race_info': '',
+        }),
+        ('horseinput', 'POST', '/horseinput/', lambda n: {
+            'track': 'CD',
+            'speed_data': "1 95\n2 91\n3 88",
+            'class_data': "1 A\n2 B\n3 B",
+            'pace_data': "1 E\n2 P\n3 S",
+            'user_insights': '',
+            'race_date': RACE_DATE,
+            'race_number': str(n % 12 + 1),
+            'model': args.model,
+        }),
+        ('horsepools', 'POST', '/horsepools/', lambda n: {
+            'track': 'CD',
+            'pools_data': "#  Win   Place  Show\n1  5000  2000   1000\n2  3000  1800   900",
+            'race_date': RACE_DATE,
+            'race_number': str(n % 12 + 1),
+            'model': args.model,
+        }),
+        ('horsetickets', 'POST', '/horsetickets/', lambda n: {
+            'first_race': str(n % 10 + 1),
+            'budget': '100',
+            'base_bet': '1.00',
+            'leg0': ticket_leg(n),
+            'leg1': ticket_leg(n + 5),
+            'leg2': ticket_leg(n + 7),
+        }),
+        ('pdfPP', 'GET', '/pdfPP/', None),
+        ('manage', 'GET', '/manage/', None),
+    ]
+    if args.pdf_dir and args.pdf_race:
+        scenarios.append(('pdfPP.process', 'POST', '/pdfPP/process', lambda n: {
+            'directory': args.pdf_dir,
+            'race_files': args.pdf_race,
+            'model': args.pdf_model,
+            'instructions': '',
+        }))
+    return scenarios
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def worker(args, scenarios, deadline, results, lock, worker_id):
+    session = requests.Session()
+    rng = random.Random(args.seed + worker_id)
+    n = 0
+    while time.monotonic() < deadline:
+        if args.requests and n >= args.requests:
+            break
+        name, method, path, form = rng.choice(scenarios)
+        start = time.perf_counter()
+        ok = False
+        try:
+            resp = session.request(method, args.url + path,
+                                   data=form(worker_id * 100000 + n) if form else None,
+                                   timeout=args.timeout)
+            # The pages render LLM failures into a 200 response
+            ok = resp.status_code < 400 and 'Error:' not in resp.text
+        except requests.RequestException:
+            pass
+        elapsed = time.perf_counter() - start
+        with lock:
+            results[name].append((elapsed, ok))
+        n += 1
+
+
+def report(results, wall):
+    rows = []
+    all_lat, all_err = [], 0
+    for name in sorted(results):
+        lat = sorted(r[0] for r in results[name])
+        errs = sum(1 for r in results[name] if not r[1])
+        all_lat.extend(lat)
+        all_err += errs
+        rows.append((name, len(lat), errs, len(lat) / wall,
+                     percentile(lat, 50), percentile(lat, 95), percentile(lat, 99)))
+    all_lat.sort()
+    rows.append(('TOTAL', len(all_lat), all_err, len(all_lat) / wall,
+                 percentile(all_lat, 50), percentile(all_lat, 95), percentile(all_lat, 99)))
+
+    print(f"{'endpoint':<20}{'reqs':>8}{'errors':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, count, errs, rps, p50, p95, p99 in rows:
+        print(f"{name:<20}{count:>8}{errs:>8}{rps:>9.1f}{p50 * 1000:>10.1f}{p95 * 1000:>10.1f}{p99 * 1000:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load test for the horse portal.")
+    parser.add_argument('--url', default='http://127.0.0.1:5500', help="base URL of the running portal")
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('-d', '--duration', type=float, default=30.0, help="seconds to run")
+    parser.add_argument('-n', '--requests', type=int, default=0, help="stop each worker after N requests (0 = duration only)")
+    parser.add_argument('--model', default='x-ai/grok-4.1-fast', help="model id sent to the form pages")
+    parser.add_argument('--pdf-dir', help="split_races subdirectory to use for /pdfPP/process")
+    parser.add_argument('--pdf-race', help="race file inside --pdf-dir, e.g. Race_1.pdf")
+    parser.add_argument('--pdf-model', default='Grok 4.1 Fast', help="display name sent to /pdfPP/process")
+    parser.add_argument('--timeout', type=float, default=120.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    args.url = args.url.rstrip('/')
+
+    scenarios = build_scenarios(args)
+    results = defaultdict(list)
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(args, scenarios, deadline, results, lock, i))
+               for i in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    print(f"{args.concurrency} workers, {wall:.1f}s wall clock")
+    report(results, wall)
+
+
+if __name__ == '__main__':
+    main()
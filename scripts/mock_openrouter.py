@@ -0,0 +1,190 @@
+# mock_openrouter.py - local stand-in for the OpenRouter chat completions API
+#                      so the app can be load tested without spending credits
+#
+# Copyright (c) 2025 tmcguirefl user on github
+# This file is part of AIHorseHandicapper project released under the MIT License.
+# See LICENSE file in the project root for licensing information.
+#
+# Serves POST /api/v1/chat/completions in the OpenRouter/OpenAI response
+# format, including "stream": true (server sent events) and the usage block
+# with its cost. Latency, errors and 429 rate limits are drawn from a random
+# generator seeded by --seed and the request body, so the same run against
+# the same inputs behaves the same way.
+#
+#   python scripts/mock_openrouter.py --latency 800 --jitter 200 --error-rate 0.02 --rate-limit 0.05
+#   python scripts/mock_openrouter.py --price-per-mtok 3 --model-price qwen/qwen-turbo=0.2
+#   OPENROUTER_BASE_URL=http://127.0.0.1:5600/api/v1 flask run
+
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from flask import Flask, request, jsonify, Response
+
+app = Flask(__name__)
+
+CONFIG = {
+    'latency_ms': 500.0,
+    'jitter_ms': 100.0,
+    'error_rate': 0.0,
+    'rate_limit': 0.0,
+    'retry_after': 1,
+    'chunk_delay_ms': 20.0,
+    'seed': 0,
+    'price_per_mtok': 1.0,
+    'model_prices': {},
+}
+
+_seen = {}
+_seen_lock = threading.Lock()
+
+CANNED_ANALYSIS = """{model} (mock)
+
+## Contenders
+1. #{a} - strongest recent speed figures - 35%
+2. #{b} - good fit for the expected pace - 25%
+3. #{c} - class drop, live longshot - 15%
+
+## Suggested Plays
+- Win: #{a}
+- Exacta box: {a}-{b}-{c}
+"""
+
+
+def request_rng(body):
+    """Deterministic generator for this request: seed + body hash + repeat count."""
+    digest = hashlib.sha256(body).hexdigest()
+    with _seen_lock:
+        n = _seen.get(digest, 0)
+        _seen[digest] = n + 1
+    return random.Random(f"{CONFIG['seed']}:{digest}:{n}")
+
+
+def completion_text(model, rng):
+    a, b, c = rng.sample(range(1, 13), 3)
+    return CANNED_ANALYSIS.format(model=model, a=a, b=b, c=c)
+
+
+def usage_for(model, messages, text):
+    prompt_chars = sum(len(m.get('content', '')) if isinstance(m.get('content'), str)
+                       else sum(len(p.get('text', '')) for p in m.get('content', []))
+                       for m in messages)
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(text) // 4
+    total_tokens = prompt_tokens + completion_tokens
+    price = CONFIG['model_prices'].get(model, CONFIG['price_per_mtok'])
+    return {
+        'prompt_tokens': prompt_tokens,
+        'completion_tokens': completion_tokens,
+        'total_tokens': total_tokens,
+        'cost': total_tokens * price / 1e6,
+    }
+
+
+@app.route('/api/v1/chat/completions', methods=['POST'])
+def chat_completions():
+    body = request.get_data()
+    rng = request_rng(body)
+    data = json.loads(body or b'{}')
+    model = data.get('model', 'mock/model')
+    messages = data.get('messages', [])
+
+    delay = max(0.0, rng.gauss(CONFIG['latency_ms'], CONFIG['jitter_ms'])) / 1000.0
+    roll = rng.random()
+
+    if roll < CONFIG['rate_limit']:
+        resp = jsonify({'error': {'code': 429, 'message': 'Rate limit exceeded (mock)'}})
+        resp.status_code = 429
+        resp.headers['Retry-After'] = str(CONFIG['retry_after'])
+        return resp
+
+    time.sleep(delay)
+
+    if roll < CONFIG['rate_limit'] + CONFIG['error_rate']:
+        resp = jsonify({'error': {'code': 502, 'message': 'Upstream provider error (mock)'}})
+        resp.status_code = 502
+        return resp
+
+    text = completion_text(model, rng)
+    completion_id = f"gen-mock-{hashlib.sha1(body).hexdigest()[:12]}"
+    created = int(time.time())
+
+    if not data.get('stream'):
+        return jsonify({
+            'id': completion_id,
+            'object': 'chat.completion',
+            'created': created,
+            'model': model,
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': text},
+                'finish_reason': 'stop',
+            }],
+            'usage': usage_for(model, messages, text),
+        })
+
+    def generate():
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            chunk = word if i == len(words) - 1 else word + ' '
+            yield 'data: ' + json.dumps({
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': {'content': chunk}, 'finish_reason': None}],
+            }) + '\n\n'
+            time.sleep(CONFIG['chunk_delay_ms'] / 1000.0)
+        yield 'data: ' + json.dumps({
+            'id': completion_id,
+            'object': 'chat.completion.chunk',
+            'created': created,
+            'model': model,
+            'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}],
+            'usage': usage_for(model, messages, text),
+        }) + '\n\n'
+        yield 'data: [DONE]\n\n'
+
+    return Response(generate(), mimetype='text/event-stream')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deterministic local OpenRouter stand-in.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5600)
+    parser.add_argument('--latency', type=float, default=CONFIG['latency_ms'], help="mean response latency in ms")
+    parser.add_argument('--jitter', type=float, default=CONFIG['jitter_ms'], help="latency standard deviation in ms")
+    parser.add_argument('--error-rate', type=float, default=CONFIG['error_rate'], help="fraction of requests answered with 502")
+    parser.add_argument('--rate-limit', type=float, default=CONFIG['rate_limit'], help="fraction of requests answered with 429")
+    parser.add_argument('--retry-after', type=int, default=CONFIG['retry_after'], help="Retry-After seconds sent with 429s")
+    parser.add_argument('--chunk-delay', type=float, default=CONFIG['chunk_delay_ms'], help="ms between streamed chunks")
+    parser.add_argument('--price-per-mtok', type=float, default=CONFIG['price_per_mtok'],
+                        help="USD per million tokens reported as usage.cost")
+    parser.add_argument('--model-price', action='append', default=[], metavar='MODEL=USD',
+                        help="per model USD per million tokens (repeatable)")
+    parser.add_argument('--seed', type=int, default=CONFIG['seed'])
+    args = parser.parse_args(argv)
+
+    model_prices = {}
+    for entry in args.model_price:
+        model, _, price = entry.rpartition('=')
+        try:
+            if not model:
+                raise ValueError
+            model_prices[model] = float(price)
+        except ValueError:
+            parser.error(f"--model-price expects MODEL=USD, got {entry}")
+
+    CONFIG.update(
+        latency_ms=args.latency, jitter_ms=args.jitter,
+        error_rate=args.error_rate, rate_limit=args.rate_limit,
+        retry_after=args.retry_after, chunk_delay_ms=args.chunk_delay,
+        seed=args.seed, price_per_mtok=args.price_per_mtok, model_prices=model_prices,
+    )
+    app.run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()